@@ -68,7 +68,7 @@ resource "aws_iam_role_policy" "sagemaker_execution_policy" {
 
 # SageMaker Model
 # Note: This assumes a model artifact exists in S3 at the specified path
-# The model artifact should be a tar.gz file containing model.pkl and inference code
+# The model artifact should be a tar.gz file containing the serialized model and inference code
 resource "aws_sagemaker_model" "optimal_call_time_predictor" {
   name               = "${var.project_name}-${var.environment}-optimal-call-time-model"
   execution_role_arn = aws_iam_role.sagemaker_execution_role.arn
@@ -12,7 +12,7 @@ Usage:
 This will create model.tar.gz that can be uploaded to S3.
 """
 
-import pickle
+import io
 import tarfile
 import os
 from datetime import datetime
@@ -20,9 +20,10 @@ from datetime import datetime
 try:
     from sklearn.ensemble import RandomForestClassifier
     import numpy as np
+    import joblib
 except ImportError:
-    print("Error: scikit-learn and numpy are required")
-    print("Install with: pip install scikit-learn numpy")
+    print("Error: scikit-learn, numpy and joblib are required")
+    print("Install with: pip install scikit-learn numpy joblib")
     exit(1)
 
 
@@ -36,29 +37,36 @@ def create_placeholder_model():
     print("Creating placeholder ML model...")
     
     # Generate synthetic training data
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n_samples = 1000
     
     # Features: day_of_week, hour_of_day, previous_answer_rate
-    X = np.random.rand(n_samples, 3)
-    X[:, 0] = np.random.randint(0, 7, n_samples)  # day_of_week
-    X[:, 1] = np.random.randint(0, 24, n_samples)  # hour_of_day
-    X[:, 2] = np.random.rand(n_samples)  # previous_answer_rate
+    X = np.empty((n_samples, 3), dtype=np.float32)
+    X[:, 0] = rng.integers(0, 7, n_samples)  # day_of_week
+    X[:, 1] = rng.integers(0, 24, n_samples)  # hour_of_day
+    X[:, 2] = rng.random(n_samples, dtype=np.float32)  # previous_answer_rate
     
-    # Target: optimal_hour (simplified logic for demo)
+    # Target: optimal_hour (simplified logic for demo), looked up by hour
     # Higher answer rates in morning (9-11) and evening (18-20)
-    y = np.where(
-        (X[:, 1] >= 9) & (X[:, 1] <= 11),
-        10,  # Morning optimal time
-        np.where(
-            (X[:, 1] >= 18) & (X[:, 1] <= 20),
-            19,  # Evening optimal time
-            14   # Default afternoon time
-        )
-    )
+    optimal_hour_by_hour = np.full(24, 14, dtype=np.int8)  # Default afternoon time
+    optimal_hour_by_hour[9:12] = 10  # Morning optimal time
+    optimal_hour_by_hour[18:21] = 19  # Evening optimal time
+    y = optimal_hour_by_hour[X[:, 1].astype(np.int8)]
     
-    # Train a simple Random Forest model
-    model = RandomForestClassifier(n_estimators=10, random_state=42)
+    # Train a small Random Forest model. The target only depends on the
+    # hour, so a shallow tree is enough. Every split may consider all three
+    # features; with the default sqrt subset (or max_features=1) a depth-4
+    # tree often cannot reach hour_of_day and misses the morning window.
+    # Without bootstrapping every tree would be identical, so one is enough.
+    model = RandomForestClassifier(
+        n_estimators=1,
+        max_depth=4,
+        min_samples_leaf=50,
+        max_features=None,
+        bootstrap=False,
+        n_jobs=1,
+        random_state=42
+    )
     model.fit(X, y)
     
     print(f"Model trained with {n_samples} samples")
@@ -67,26 +75,83 @@ def create_placeholder_model():
     return model
 
 
+def create_lookup_table(model):
+    """Distill the trained model into per-hour lookup tables for serving"""
+    
+    # The target only depends on hour_of_day, so evaluate the model once for
+    # every hour (averaged over the days of the week) and serve the result
+    # with a single array lookup instead of walking the trees per request.
+    days, hours = np.meshgrid(np.arange(7), np.arange(24))
+    grid = np.empty((days.size, 3), dtype=np.float32)
+    grid[:, 0] = days.ravel()
+    grid[:, 1] = hours.ravel()
+    grid[:, 2] = 0.5
+    
+    probabilities = model.predict_proba(grid).reshape(24, 7, -1).mean(axis=1)
+    
+    # Quantize to one byte per hour: hours are already small integers and the
+    # confidence is stored as a whole percentage
+    lookup_table = {
+        'optimal_hours': model.classes_[probabilities.argmax(axis=1)].astype(np.int8),
+        'confidence_pct': np.rint(probabilities.max(axis=1) * 100).astype(np.uint8)
+    }
+    
+    print(f"Lookup table: {lookup_table['optimal_hours'].tolist()}")
+    
+    return lookup_table
+
+
 def create_inference_script():
     """Create a custom inference script for SageMaker"""
     
-    inference_code = '''import json
-import pickle
-import os
+    inference_code = '''import os
+import zlib
+import joblib
+import msgpack
 import numpy as np
+import orjson
+
+# Gzip-compressed requests use their own content types, so the container
+# passes the body through as bytes instead of decoding it as UTF-8 text
+_GZIP_CONTENT_TYPES = {
+    'application/x-gzip-json': 'application/json',
+    'application/x-gzip-msgpack': 'application/x-msgpack'
+}
+
+# Largest decompressed body accepted (the InvokeEndpoint payload limit)
+_MAX_DECOMPRESSED_BYTES = 6 * 1024 * 1024
+
+# Reused input buffer for single predictions. The container's gevent workers
+# can interleave requests, but nothing between filling it in input_fn and
+# reading it in predict_fn yields, so no other request can overwrite it.
+_SCRATCH = np.empty((1, 3), dtype=np.float32)
 
 def model_fn(model_dir):
-    """Load the model from the model_dir"""
-    model_path = os.path.join(model_dir, 'model.pkl')
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    return model
+    """Load the per-hour lookup tables from the model_dir"""
+    lookup_table = joblib.load(os.path.join(model_dir, 'model.joblib'))
+    
+    # Keep both tables one byte per hour; predict_fn gathers int8 hours and
+    # uint8 confidence percentages, and only output_fn widens the result
+    return {
+        'optimal_hours': np.ascontiguousarray(lookup_table['optimal_hours'], dtype=np.int8),
+        'confidence_pct': np.ascontiguousarray(lookup_table['confidence_pct'], dtype=np.uint8)
+    }
+
+def _gunzip(body):
+    """Decompress a gzip body of at most _MAX_DECOMPRESSED_BYTES"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, _MAX_DECOMPRESSED_BYTES)
+    if decompressor.unconsumed_tail or not decompressor.eof:
+        raise ValueError(
+            f"Gzip body is truncated or larger than {_MAX_DECOMPRESSED_BYTES} bytes"
+        )
+    return data
 
 def input_fn(request_body, content_type='application/json'):
     """
     Parse input data.
     
-    Expected input format:
+    Expected input format (application/json or application/x-msgpack):
     {
         "features": [day_of_week, hour_of_day, previous_answer_rate]
     }
@@ -97,63 +162,87 @@ def input_fn(request_body, content_type='application/json'):
             {"day_of_week": 2, "hour_of_day": 15, "previous_answer_rate": 0.3}
         ]
     }
+    
+    Either form may set "return_confidence": false to skip the confidence
+    lookup and only return the optimal hours. Gzip-compressed bodies are sent
+    as application/x-gzip-json or application/x-gzip-msgpack.
     """
+    if content_type in _GZIP_CONTENT_TYPES:
+        request_body = _gunzip(request_body)
+        content_type = _GZIP_CONTENT_TYPES[content_type]
+    
     if content_type == 'application/json':
-        input_data = json.loads(request_body)
-        
-        # Handle single feature array
-        if 'features' in input_data:
-            return np.array([input_data['features']])
-        
-        # Handle batch of contacts
-        elif 'contacts' in input_data:
-            features = []
-            for contact in input_data['contacts']:
-                features.append([
-                    contact.get('day_of_week', 0),
-                    contact.get('hour_of_day', 12),
-                    contact.get('previous_answer_rate', 0.5)
-                ])
-            return np.array(features)
-        
-        else:
-            raise ValueError("Input must contain 'features' or 'contacts' key")
+        input_data = orjson.loads(request_body)
+    elif content_type == 'application/x-msgpack':
+        input_data = msgpack.unpackb(request_body, raw=False)
     else:
         raise ValueError(f"Unsupported content type: {content_type}")
+    
+    # Handle single feature array
+    if 'features' in input_data:
+        values = input_data['features']
+        if len(values) != 3:
+            raise ValueError("'features' must have 3 values")
+        _SCRATCH[0, 0] = values[0]
+        _SCRATCH[0, 1] = values[1]
+        _SCRATCH[0, 2] = values[2]
+        features = _SCRATCH
+    
+    # Handle batch of contacts
+    elif 'contacts' in input_data:
+        contacts = input_data['contacts']
+        features = np.empty((len(contacts), 3), dtype=np.float32)
+        for i, contact in enumerate(contacts):
+            features[i, 0] = contact.get('day_of_week', 0)
+            features[i, 1] = contact.get('hour_of_day', 12)
+            features[i, 2] = contact.get('previous_answer_rate', 0.5)
+    
+    else:
+        raise ValueError("Input must contain 'features' or 'contacts' key")
+    
+    return_confidence = input_data.get('return_confidence', True)
+    if not isinstance(return_confidence, bool):
+        raise ValueError("'return_confidence' must be true or false")
+    
+    return features, return_confidence
 
 def predict_fn(input_data, model):
-    """Make predictions"""
-    predictions = model.predict(input_data)
-    probabilities = model.predict_proba(input_data)
+    """Make predictions by looking up each contact's hour of day"""
+    features, return_confidence = input_data
+    
+    # Missing or null values become NaN in the float32 features and would
+    # otherwise cast to hour 0 and return a valid-looking prediction
+    invalid_rows = ~np.isfinite(features).all(axis=1)
+    if invalid_rows.any():
+        raise ValueError(f"Non-finite feature values in rows {np.flatnonzero(invalid_rows).tolist()}")
+    
+    hours = np.clip(features[:, 1], 0, 23).astype(np.int8)
     
     return {
-        'predictions': predictions,
-        'probabilities': probabilities
+        'predictions': model['optimal_hours'][hours],
+        'confidence_pct': model['confidence_pct'][hours] if return_confidence else None
     }
 
 def output_fn(prediction, accept='application/json'):
     """
     Format output.
     
-    Output format:
+    Output format (application/json or application/x-msgpack):
     {
         "optimal_hours": [10, 19, 14],
         "confidence": [0.85, 0.92, 0.67]
     }
+    
+    "confidence" is omitted when the request set "return_confidence": false.
     """
+    result = {'optimal_hours': prediction['predictions'].tolist()}
+    if prediction['confidence_pct'] is not None:
+        result['confidence'] = (prediction['confidence_pct'] / 100.0).tolist()
+    
     if accept == 'application/json':
-        predictions = prediction['predictions']
-        probabilities = prediction['probabilities']
-        
-        # Get confidence as max probability for each prediction
-        confidence = [float(max(probs)) for probs in probabilities]
-        
-        result = {
-            'optimal_hours': predictions.tolist(),
-            'confidence': confidence
-        }
-        
-        return json.dumps(result), accept
+        return orjson.dumps(result), accept
+    elif accept == 'application/x-msgpack':
+        return msgpack.packb(result), accept
     else:
         raise ValueError(f"Unsupported accept type: {accept}")
 '''
@@ -163,43 +252,42 @@ def output_fn(prediction, accept='application/json'):
 
 def create_requirements():
     """Create requirements.txt for the model"""
-    requirements = """scikit-learn==1.2.2
-numpy==1.24.3
+    requirements = """numpy==1.24.3
+joblib==1.2.0
+msgpack==1.0.5
+orjson==3.8.14
 """
     return requirements
 
 
-def package_model(model):
-    """Package the model and inference code into a tar.gz file"""
+def package_model(lookup_table):
+    """Package the lookup tables and inference code into a tar.gz file"""
     
     print("\nPackaging model artifact...")
     
-    # Save model
-    with open('model.pkl', 'wb') as f:
-        pickle.dump(model, f)
-    print("✓ Saved model.pkl")
-    
-    # Save inference script
-    with open('inference.py', 'w') as f:
-        f.write(create_inference_script())
-    print("✓ Created inference.py")
-    
-    # Save requirements
-    with open('requirements.txt', 'w') as f:
-        f.write(create_requirements())
-    print("✓ Created requirements.txt")
-    
-    # Create tar.gz
-    with tarfile.open('model.tar.gz', 'w:gz') as tar:
-        tar.add('model.pkl')
-        tar.add('inference.py')
-        tar.add('requirements.txt')
+    # Save lookup tables (plain NumPy arrays, so serving does not need scikit-learn)
+    joblib.dump(lookup_table, 'model.joblib', compress=('gzip', 3))
+    print("✓ Saved model.joblib")
+    
+    # Create tar.gz, adding the generated text files straight from memory
+    with tarfile.open('model.tar.gz', 'w:gz', compresslevel=9) as tar:
+        tar.add('model.joblib')
+        
+        for name, content in [
+            ('inference.py', create_inference_script()),
+            ('requirements.txt', create_requirements())
+        ]:
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(datetime.now().timestamp())
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+            print(f"✓ Added {name}")
     print("✓ Created model.tar.gz")
     
     # Clean up temporary files
-    os.remove('model.pkl')
-    os.remove('inference.py')
-    os.remove('requirements.txt')
+    os.remove('model.joblib')
     
     print("\n✅ Model artifact created successfully!")
     print("\nNext steps:")
@@ -224,7 +312,7 @@ def main():
     
     # Create and package model
     model = create_placeholder_model()
-    package_model(model)
+    package_model(create_lookup_table(model))
     
     print("\n" + "=" * 60)
 
@@ -9,22 +9,69 @@ Usage:
     
     # Or with AWS profile
     python test_endpoint.py --endpoint-name YOUR-ENDPOINT-NAME --profile YOUR-PROFILE
+    
+    # Or send MessagePack instead of JSON (requires msgpack)
+    python test_endpoint.py --endpoint-name YOUR-ENDPOINT-NAME --msgpack
+    
+    # Or gzip-compress the request bodies
+    python test_endpoint.py --endpoint-name YOUR-ENDPOINT-NAME --gzip
 """
 
+import gzip
 import json
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import boto3
+    from botocore.config import Config
     from botocore.exceptions import ClientError
 except ImportError:
     print("Error: boto3 is required")
     print("Install with: pip install boto3")
     sys.exit(1)
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Gzip-compressed requests are sent under their own content types so the
+# endpoint container hands the body to input_fn as bytes instead of decoding
+# it as UTF-8 text (which it does for application/json)
+GZIP_CONTENT_TYPES = {
+    'application/json': 'application/x-gzip-json',
+    'application/x-msgpack': 'application/x-gzip-msgpack'
+}
+
+
+def request_content_type(content_type, compress=False):
+    """Content type to send for a payload, accounting for compression"""
+    return GZIP_CONTENT_TYPES[content_type] if compress else content_type
+
+
+def encode_payload(payload, content_type, compress=False):
+    """Serialize a request payload for the given content type"""
+    if content_type == 'application/x-msgpack':
+        body = msgpack.packb(payload)
+    else:
+        body = json.dumps(payload).encode()
+    
+    if compress:
+        body = gzip.compress(body)
+    return body
+
+
+def decode_response(body, content_type):
+    """Deserialize a response body for the given content type"""
+    if content_type == 'application/x-msgpack':
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body.decode())
 
-def test_single_prediction(client, endpoint_name):
+
+def test_single_prediction(client, endpoint_name, content_type='application/json', compress=False):
     """Test endpoint with a single prediction"""
     
     print("\n" + "=" * 60)
@@ -40,11 +87,12 @@ def test_single_prediction(client, endpoint_name):
     try:
         response = client.invoke_endpoint(
             EndpointName=endpoint_name,
-            ContentType='application/json',
-            Body=json.dumps(payload)
+            ContentType=request_content_type(content_type, compress),
+            Accept=content_type,
+            Body=encode_payload(payload, content_type, compress)
         )
         
-        result = json.loads(response['Body'].read().decode())
+        result = decode_response(response['Body'].read(), content_type)
         print(f"\nOutput: {json.dumps(result, indent=2)}")
         print("✅ Test passed!")
         return True
@@ -54,7 +102,7 @@ def test_single_prediction(client, endpoint_name):
         return False
 
 
-def test_batch_prediction(client, endpoint_name):
+def test_batch_prediction(client, endpoint_name, content_type='application/json', compress=False):
     """Test endpoint with batch prediction"""
     
     print("\n" + "=" * 60)
@@ -74,11 +122,12 @@ def test_batch_prediction(client, endpoint_name):
     try:
         response = client.invoke_endpoint(
             EndpointName=endpoint_name,
-            ContentType='application/json',
-            Body=json.dumps(payload)
+            ContentType=request_content_type(content_type, compress),
+            Accept=content_type,
+            Body=encode_payload(payload, content_type, compress)
         )
         
-        result = json.loads(response['Body'].read().decode())
+        result = decode_response(response['Body'].read(), content_type)
         print(f"\nOutput: {json.dumps(result, indent=2)}")
         print("✅ Test passed!")
         return True
@@ -88,7 +137,7 @@ def test_batch_prediction(client, endpoint_name):
         return False
 
 
-def test_edge_cases(client, endpoint_name):
+def test_edge_cases(client, endpoint_name, content_type='application/json', compress=False):
     """Test endpoint with edge cases"""
     
     print("\n" + "=" * 60)
@@ -118,27 +167,50 @@ def test_edge_cases(client, endpoint_name):
         }
     ]
     
+    # Send all edge cases as one batch request instead of one call per case
+    payload = {
+        "contacts": [
+            {
+                "day_of_week": test_case["payload"]["features"][0],
+                "hour_of_day": test_case["payload"]["features"][1],
+                "previous_answer_rate": test_case["payload"]["features"][2]
+            }
+            for test_case in test_cases
+        ]
+    }
+    
+    try:
+        response = client.invoke_endpoint(
+            EndpointName=endpoint_name,
+            ContentType=request_content_type(content_type, compress),
+            Accept=content_type,
+            Body=encode_payload(payload, content_type, compress)
+        )
+        
+        result = decode_response(response['Body'].read(), content_type)
+        
+    except ClientError as e:
+        print(f"❌ Failed: {e}")
+        print(f"\nEdge case results: 0 passed, {len(test_cases)} failed")
+        return False
+    
+    optimal_hours = result.get('optimal_hours', [])
+    confidence = result.get('confidence', [])
+    
     passed = 0
     failed = 0
     
-    for test_case in test_cases:
+    for i, test_case in enumerate(test_cases):
         print(f"\nTesting: {test_case['name']}")
         print(f"Input: {json.dumps(test_case['payload'])}")
         
-        try:
-            response = client.invoke_endpoint(
-                EndpointName=endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps(test_case['payload'])
-            )
-            
-            result = json.loads(response['Body'].read().decode())
-            print(f"Output: {json.dumps(result)}")
+        if i < len(optimal_hours) and i < len(confidence):
+            output = {"optimal_hours": [optimal_hours[i]], "confidence": [confidence[i]]}
+            print(f"Output: {json.dumps(output)}")
             print("✅ Passed")
             passed += 1
-            
-        except ClientError as e:
-            print(f"❌ Failed: {e}")
+        else:
+            print(f"❌ Failed: no prediction returned (got {json.dumps(result)})")
             failed += 1
     
     print(f"\nEdge case results: {passed} passed, {failed} failed")
@@ -159,22 +231,32 @@ def test_error_handling(client, endpoint_name):
         {"name": "Empty payload", "payload": {}},
     ]
     
-    for test in invalid_payloads:
+    # Serialize each payload once so the printed input is exactly what is sent
+    bodies = [
+        test['payload'] if isinstance(test['payload'], str) else json.dumps(test['payload'])
+        for test in invalid_payloads
+    ]
+    
+    def invoke(body):
+        response = client.invoke_endpoint(
+            EndpointName=endpoint_name,
+            ContentType='application/json',
+            Body=body
+        )
+        
+        return json.loads(response['Body'].read().decode())
+    
+    # The cases are independent, so send them concurrently (botocore clients
+    # are thread-safe) and report the results in order
+    with ThreadPoolExecutor(max_workers=len(invalid_payloads)) as executor:
+        futures = [executor.submit(invoke, body) for body in bodies]
+    
+    for test, body, future in zip(invalid_payloads, bodies, futures):
         print(f"\nTesting: {test['name']}")
+        print(f"Input: {body}")
         
         try:
-            if isinstance(test['payload'], str):
-                body = test['payload']
-            else:
-                body = json.dumps(test['payload'])
-            
-            response = client.invoke_endpoint(
-                EndpointName=endpoint_name,
-                ContentType='application/json',
-                Body=body
-            )
-            
-            result = json.loads(response['Body'].read().decode())
+            result = future.result()
             print(f"⚠️  Expected error but got result: {result}")
             
         except ClientError as e:
@@ -235,6 +317,16 @@ def main():
         '--profile',
         help='AWS profile to use (optional)'
     )
+    parser.add_argument(
+        '--msgpack',
+        action='store_true',
+        help='Send requests as MessagePack instead of JSON (requires msgpack)'
+    )
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Gzip-compress request bodies'
+    )
     
     args = parser.parse_args()
     
@@ -242,13 +334,30 @@ def main():
     print("SageMaker Endpoint Testing Suite")
     print("=" * 60)
     
+    content_type = 'application/json'
+    if args.msgpack:
+        if msgpack is None:
+            print("⚠️  msgpack is not installed, falling back to JSON")
+            print("Install with: pip install msgpack")
+        else:
+            content_type = 'application/x-msgpack'
+    print(f"Content type: {content_type}{' (gzip)' if args.gzip else ''}")
+    
     # Create boto3 client
     session_kwargs = {'region_name': args.region}
     if args.profile:
         session_kwargs['profile_name'] = args.profile
     
     session = boto3.Session(**session_kwargs)
-    client = session.client('sagemaker-runtime')
+    
+    # Reuse one runtime client with keep-alive connections for every test so
+    # invocations do not pay for a new TLS handshake each time
+    client_config = Config(
+        max_pool_connections=50,
+        tcp_keepalive=True,
+        retries={'mode': 'adaptive', 'max_attempts': 3}
+    )
+    client = session.client('sagemaker-runtime', config=client_config)
     sagemaker_client = session.client('sagemaker')
     
     # Check endpoint status
@@ -258,9 +367,9 @@ def main():
     # Run tests
     results = []
     
-    results.append(("Single Prediction", test_single_prediction(client, args.endpoint_name)))
-    results.append(("Batch Prediction", test_batch_prediction(client, args.endpoint_name)))
-    results.append(("Edge Cases", test_edge_cases(client, args.endpoint_name)))
+    results.append(("Single Prediction", test_single_prediction(client, args.endpoint_name, content_type, args.gzip)))
+    results.append(("Batch Prediction", test_batch_prediction(client, args.endpoint_name, content_type, args.gzip)))
+    results.append(("Edge Cases", test_edge_cases(client, args.endpoint_name, content_type, args.gzip)))
     results.append(("Error Handling", test_error_handling(client, args.endpoint_name)))
     
     # Summary